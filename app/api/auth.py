@@ -2,14 +2,18 @@
 """
 Authentication endpoints for user registration and login.
 """
+import os
 from datetime import timedelta
-from typing import Any
+from typing import Any, Optional
+import anyio
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.utils.security import create_access_token, get_password_hash, verify_password
+from app.utils.security import create_access_token, get_password_hash, verify_password, password_needs_rehash
 from app.db.base import get_db
 from app.db.models.user import User
 from app.api.schemas.user import UserCreate, User as UserSchema
@@ -19,10 +23,22 @@ from app.core.exceptions import AuthenticationError, DuplicateError
 
 router = APIRouter()
 
+# password hashing is CPU bound - run it on worker threads, at most one per core
+_hash_limiter: Optional[anyio.CapacityLimiter] = None
+
+
+def get_hash_limiter() -> anyio.CapacityLimiter:
+    """Return the capacity limiter for password hashing threads (created on first use inside the event loop)."""
+    global _hash_limiter
+    if _hash_limiter is None:
+        _hash_limiter = anyio.CapacityLimiter(os.cpu_count() or 1)
+    return _hash_limiter
+
+
 @router.post("/register", response_model=UserSchema)
-def register_user(
+async def register_user(
         *,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         user_in: UserCreate,
 ) -> Any:
     """
@@ -38,12 +54,12 @@ def register_user(
     Raises:
         DuplicateError: If username already exists
     """
-    logger.info(f"Attempting to register user: {user_in.username}")
+    logger.info("Attempting to register user: %s", user_in.username)
     try:
-        # Check if user exists
-        user = db.query(User).filter(User.username == user_in.username).first()
-        if user:
-            logger.warning(f"Registration failed: Username {user_in.username} already exists")
+        # Check if user exists - existence probe only, no user row is loaded
+        exists_stmt = select(1).where(User.username == user_in.username).limit(1)
+        if (await db.execute(exists_stmt)).scalar():
+            logger.warning("Registration failed: Username %s already exists", user_in.username)
             raise DuplicateError(
                 detail="Username already registered"
             )
@@ -51,15 +67,27 @@ def register_user(
         # Create new user
         user = User(
             username=user_in.username,
-            hashed_password=get_password_hash(user_in.password)
+            hashed_password=await anyio.to_thread.run_sync(
+                get_password_hash, user_in.password, limiter=get_hash_limiter()
+            )
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
-        logger.info(f"Successfully registered user: {user_in.username}")
+        await db.commit()
+        await db.refresh(user)
+        logger.info("Successfully registered user: %s", user_in.username)
         return user
-    except Exception as e:
-        logger.error(f"Error during user registration: {str(e)}")
+    except DuplicateError:
+        raise
+    except IntegrityError:
+        # the same username was registered concurrently, after the existence check
+        await db.rollback()
+        logger.warning("Registration failed: Username %s already exists", user_in.username)
+        raise DuplicateError(
+            detail="Username already registered"
+        )
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error("Error during user registration: %s", e)
         raise AuthenticationError(
             message="Registration failed",
             detail="An error occurred during registration"
@@ -70,7 +98,7 @@ def register_user(
 
 @router.post("/login", response_model=Token)
 async def login(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
@@ -86,40 +114,51 @@ async def login(
     Raises:
         AuthenticationError: If authentication fails
     """
-    logger.info(f"=== Login Attempt Started for {form_data.username} ===")
+    logger.debug("Login attempt for user: %s", form_data.username)
     try:
         data_username = form_data.username
         data_pwd = form_data.password
         # Authenticate user
-        user = db.query(User).filter(User.username == data_username).first()
-        if not user or not verify_password(data_pwd, user.hashed_password):
-            logger.warning(f"Failed login attempt for user: {form_data.username}")
+        user = (await db.execute(select(User).where(User.username == data_username))).scalar_one_or_none()
+        if not user or not await anyio.to_thread.run_sync(
+                verify_password, data_pwd, user.hashed_password, limiter=get_hash_limiter()
+        ):
+            logger.warning("Failed login attempt for user: %s", form_data.username)
             raise AuthenticationError(
                 message="Login failed",
                 detail="Incorrect username or password",
                 headers = {"WWW-Authenticate": "Bearer"},
             )
-        logger.info(f"User authenticated successfully: {user.username}")
+        # keep the plain value - a failed rehash rollback below expires the user's attributes
+        username = user.username
+        logger.info("User authenticated successfully: %s", username)
+        # upgrade legacy (bcrypt) hashes to the current default scheme - optional, never fails the login
+        if password_needs_rehash(user.hashed_password):
+            try:
+                user.hashed_password = await anyio.to_thread.run_sync(
+                    get_password_hash, data_pwd, limiter=get_hash_limiter()
+                )
+                await db.commit()
+                logger.info("Password hash upgraded for user: %s", username)
+            except SQLAlchemyError as e:
+                await db.rollback()
+                logger.warning("Password hash upgrade failed for user %s: %s", username, e)
         # Create access token
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": user.username},
+            data={"sub": username},
             expires_delta=access_token_expires
         )
 
-        logger.info("=== Login Attempt Completed ===")
-        # return token in OAuth2 format
-        return Token(
-            access_token=access_token,
-            token_type="bearer"
-        )
+        # return token in OAuth2 format - validated once against the Token response_model
+        return {
+            "access_token": access_token,
+            "token_type": "bearer"
+        }
     except AuthenticationError:
         raise
     except Exception as e:
-        logger.error(f"=== Login Error ===")
-        logger.error(f"Error type: {type(e).__name__}")
-        logger.error(f"Error message: {str(e)}")
-        logger.error("=== End Error Details ===")
+        logger.error("Login error: %s: %s", type(e).__name__, e)
         raise AuthenticationError(
             message="Login failed",
             detail=f"An error occurred during login. Error type : {type(e).__name__}. Full error message:  {str(e)}."
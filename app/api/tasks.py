@@ -3,8 +3,10 @@
 Task management endpoints for CRUD operations.
 """
 from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.base import get_db
 from app.utils.security import get_current_user
@@ -15,12 +17,34 @@ from app.api.schemas.task import TaskCreate, TaskUpdate, Task as TaskSchema
 # Create router instance
 router = APIRouter()
 
+# response header carrying the keyset cursor for the next page of tasks
+NEXT_PAGE_HEADER = "X-Next-After"
+
+
+async def _raise_task_access_error(db: AsyncSession, task_id: int) -> None:
+    """
+    Raise the matching error after an ownership-filtered statement matched no task.
+
+    Raises:
+        HTTPException: 404 if the task does not exist, 403 if it belongs to another user
+    """
+    exists = (await db.execute(select(Task.id).where(Task.id == task_id))).first()
+    if exists is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task does not exist"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="You don't have permission to access this task"
+    )
+
 
 # Create task endpoint
 @router.post("/tasks", response_model=TaskSchema)
-def create_task(
+async def create_task(
         *,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         task_in: TaskCreate,
         current_user: User = Depends(get_current_user)
 ) -> Any:
@@ -43,44 +67,60 @@ def create_task(
     )
     # Add to database
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await db.refresh(task)
 
     return task
 
 
-@router.get("/tasks", response_model=List[TaskSchema])
-def get_tasks(
-        db: Session = Depends(get_db),
+# response rows are built directly - no response_model validation / jsonable_encoder pass per task
+@router.get("/tasks", response_class=ORJSONResponse, responses={200: {"model": List[TaskSchema]}})
+async def get_tasks(
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_user),
-        completed: bool | None = None
+        completed: bool | None = None,
+        limit: int = Query(100, ge=1, le=500),
+        after_id: int | None = None
 ) -> Any:
     """
-    Retrieve all tasks for the current user.
+    Retrieve a page of tasks for the current user, ordered by id.
 
     Args:
         db: Database session
         current_user: Authenticated user
         completed: Optional filter by completion status
+        limit: Maximum number of tasks to return
+        after_id: Return only tasks with a greater id (keyset cursor from the previous page)
 
     Returns:
-        List of tasks
+        List of tasks. When the page is full, the X-Next-After header holds the
+        after_id value for the next page.
     """
-    # Build query for current user's tasks
-    query = db.query(Task).filter(Task.user_id == current_user.id) #
+    # Build query for current user's tasks - plain columns, rows are not hydrated into ORM objects
+    query = (
+        select(Task.id, Task.description, Task.completed, Task.user_id)
+        .where(Task.user_id == current_user.id)
+    )
 
     # Apply completion status filter if provided
     if completed is not None:
-        query = query.filter(Task.completed == completed)
+        query = query.where(Task.completed == completed)
+    # keyset pagination - seek past the previous page instead of using OFFSET
+    if after_id is not None:
+        query = query.where(Task.id > after_id)
+    query = query.order_by(Task.id).limit(limit)
 
     # Execute query and return results
-    return query.all()
+    result = await db.execute(query)
+    tasks = [dict(row) for row in result.mappings()]
+    headers = {NEXT_PAGE_HEADER: str(tasks[-1]["id"])} if len(tasks) == limit else None
+    return ORJSONResponse(tasks, headers=headers)
 
 # endpoint for updating tasks
 @router.put("/tasks/{task_id}", response_model=TaskSchema)
-def update_task(
+async def update_task(
         *,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         task_id: int,
         task_in: TaskUpdate,
         current_user: User = Depends(get_current_user)
@@ -100,37 +140,33 @@ def update_task(
     Raises:
         HTTPException: If task not found or not owned by user
     """
-    # get task and verify existence + ownership
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task does not exist"
-        )
-    if task.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to access this task"
+    owned_task = (Task.id == task_id, Task.user_id == current_user.id)
+
+    # Update task fields if provided in input - ownership is part of the WHERE clause
+    values = {field: value for field, value in task_in.dict().items() if value is not None}
+    if values:
+        await db.execute(
+            update(Task)
+            .where(*owned_task)
+            .values(**values)
+            .execution_options(synchronize_session=False)
         )
 
-    # Update task fields if provided in input
-    if task_in.description is not None:
-        task.description = task_in.description
-    if task_in.completed is not None:
-        task.completed = task_in.completed
+    # read back the updated row (sqlite has no UPDATE ... RETURNING on SQLAlchemy 1.4)
+    task = (await db.execute(select(Task).where(*owned_task))).scalar_one_or_none()
+    if task is None:
+        await _raise_task_access_error(db, task_id)
 
     # Save changes
-    db.add(task)
-    db.commit()
-    db.refresh(task)
+    await db.commit()
 
     return task
 
 #  DELETE endpoint
 @router.delete("/tasks/{task_id}")
-def delete_task(
+async def delete_task(
         *,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         task_id: int,
         current_user: User = Depends(get_current_user)
 ) -> Any:
@@ -148,21 +184,14 @@ def delete_task(
     Raises:
         HTTPException: If task not found or not owned by user
     """
-    # find task and verify existence and ownership
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task does not exist"
-        )
-    if task.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to access this task"
-        )
-
-    # delete task
-    db.delete(task)
-    db.commit()
+    # delete task - ownership is part of the WHERE clause
+    result = await db.execute(
+        delete(Task)
+        .where(Task.id == task_id, Task.user_id == current_user.id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await _raise_task_access_error(db, task_id)
+    await db.commit()
 
     return {"message": "Task deleted successfully"}
\ No newline at end of file
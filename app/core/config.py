@@ -37,15 +37,21 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # password hashing cost - the test suite lowers these, hashes it creates are not kept
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 10))
+    ARGON2_ROUNDS: int = int(os.getenv("ARGON2_ROUNDS", 2))
+    ARGON2_MEMORY_COST: int = int(os.getenv("ARGON2_MEMORY_COST", 19456))  # KiB
 
     # ------ Environment settings ------
     ENV: str = os.getenv("ENV", "production")  # values: production / test
+    # verbose logging in test mode, warnings and above in production
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO" if ENV == "test" else "WARNING")
 
     # ------ Database settings ------
     # Production database - persistent storage
-    SQLITE_URL: str = "sqlite:///./sql_app.db"
+    SQLITE_URL: str = "sqlite+aiosqlite:///./sql_app.db"
     # Test database - temporary storage
-    TEST_SQLITE_URL: str = "sqlite:///./test.db"
+    TEST_SQLITE_URL: str = "sqlite+aiosqlite:///./test.db"
 
     @property
     def DATABASE_URL(self) -> str:
@@ -58,3 +64,5 @@ class Settings(BaseSettings):
 
 #  global settings object
 settings = Settings()
+# signing key as bytes - hot paths use this instead of re-encoding settings.SECRET_KEY
+SECRET_KEY_BYTES = settings.SECRET_KEY.encode()
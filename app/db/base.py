@@ -1,52 +1,114 @@
 # app/db/base.py
 """
 Database configuration module.
-Sets up SQLAlchemy and creates the database engine.
+Sets up SQLAlchemy and creates the async database engine on first use
+(application startup), not at import time.
 """
 import os
-from sqlalchemy import create_engine, inspect
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 from app.utils.logging import logger
 from app.db.base_class import Base
 from app.db.models.user import User
 from app.db.models.task import Task
 
+TARGET_DB = settings.DATABASE_URL
 
+# engine and session factory - created by get_engine() on first use
+engine: Optional[AsyncEngine] = None
+SessionLocal: Optional[sessionmaker] = None
 
-# Check database path and permissions
-db_path = settings.DATABASE_URL.replace('sqlite:///', '')
-db_dir = os.path.dirname(db_path) or '.'
-# Check directory permissions
-try:
-    if not os.path.exists(db_dir):
-        os.makedirs(db_dir)
-    if not os.access(db_dir, os.W_OK):
-        logger.error(f"No write permission in directory {db_dir}")
-        # else:
-        # logger.info(f"Directory {db_dir} is writable")
-except Exception as e:
-    logger.error(f"Error checking directory permissions: {e}")
 
-TARGET_DB = settings.DATABASE_URL
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Apply journal and cache pragmas to every new SQLite connection.
+    WAL lets readers proceed during writes, NORMAL sync skips an fsync per commit.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
+def _build_engine() -> AsyncEngine:
+    """
+    Check the database directory and create the async SQLAlchemy engine.
+
+    Returns:
+        AsyncEngine: Engine bound to settings.DATABASE_URL
+    """
+    # Check database path and permissions
+    db_path = TARGET_DB.split(':///', 1)[-1]
+    db_dir = os.path.dirname(db_path) or '.'
+    # Check directory permissions
+    try:
+        if not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        if not os.access(db_dir, os.W_OK):
+            logger.error("No write permission in directory %s", db_dir)
+            # else:
+            # logger.info(f"Directory {db_dir} is writable")
+    except Exception as e:
+        logger.error("Error checking directory permissions: %s", e)
+
+    # Create async SQLAlchemy engine - DB waits no longer hold a threadpool slot
+    new_engine = create_async_engine(
+        TARGET_DB,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=20,
+        max_overflow=10,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        echo=settings.ENV == "test"  # SQL echo only in test mode - it formats and logs every statement
+    )
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", set_sqlite_pragmas)
+    return new_engine
+
+
+def get_engine() -> AsyncEngine:
+    """
+    Return the database engine, creating it and the SessionLocal factory on first call.
+    """
+    global engine, SessionLocal
+    if engine is None:
+        engine = _build_engine()
+        # Create SessionLocal class
+        SessionLocal = sessionmaker(
+            engine,
+            class_=AsyncSession,
+            autocommit=False,
+            autoflush=False,
+            expire_on_commit=False
+        )
+    return engine
+
+
+# indexes older databases still carry but the models no longer define (they only slow writes)
+OBSOLETE_INDEXES = ("ix_tasks_description",)
+
+
+def create_missing_indexes(conn):
+    """Create model indexes that do not exist yet on already existing tables."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
+def drop_obsolete_indexes(conn):
+    """Drop indexes that were removed from the models from already existing tables."""
+    for name in OBSOLETE_INDEXES:
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    TARGET_DB,
-    connect_args={"check_same_thread": False},
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=True
-)
-# Create SessionLocal class
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine
-)
 
 #  Database initialization function
-def init_database():
+async def init_database():
     """
     Initialize database and create all tables.
     Should be called when application starts.
@@ -54,37 +116,53 @@ def init_database():
     try:
         logger.info("Starting database initialization...")
 
-        if settings.ENV == "test":
-            logger.info("We are in test mode (ENV = test)")
-            Base.metadata.drop_all(bind=engine)
-        else:
-            logger.info("We are in production mode (ENV = production)")
-        # logger.info(f"Registered models: {Base.metadata.tables.keys()}")
-        # test and log connecting to the database
-        with engine.connect() as conn:
+        async with get_engine().begin() as conn:
+            if settings.ENV == "test":
+                logger.info("We are in test mode (ENV = test)")
+                await conn.run_sync(Base.metadata.drop_all)
+            else:
+                logger.info("We are in production mode (ENV = production)")
+            # logger.info(f"Registered models: {Base.metadata.tables.keys()}")
             logger.info("Successfully connected to database")
 
-        # create database tables
-        Base.metadata.create_all(bind=engine)
+            # create database tables
+            await conn.run_sync(Base.metadata.create_all)
+            # create_all skips existing tables - add indexes introduced after a table was created
+            await conn.run_sync(create_missing_indexes)
+            await conn.run_sync(drop_obsolete_indexes)
         logger.info("Tables created successfully")
     except Exception as e:
-        logger.error(f"Error initializing database: {str(e)}")
+        logger.error("Error initializing database: %s", e)
         raise
 
 
+async def close_database():
+    """
+    Dispose of the engine's connection pool.
+    Should be called when application shuts down.
+    """
+    global engine, SessionLocal
+    if engine is None:
+        return
+    await engine.dispose()
+    engine = None
+    SessionLocal = None
+    logger.info("Database connections closed")
+
+
 # dependency
-def get_db():
+async def get_db():
     """
-    Get database session.
+    Get async database session.
     Dependencies will use this to get a session.
     """
-    db = SessionLocal()
-    try:
-        yield db
-    except Exception as e:
-        # log database errors
-        logger.error(f"Database session error: {str(e)}")
-        raise
-    finally:
-        db.close()
+    get_engine()
+    async with SessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            # log database errors and return the connection to the pool clean
+            logger.error("Database session error: %s", e)
+            await db.rollback()
+            raise
 
@@ -3,7 +3,7 @@
 Task database model.
 Defines the structure of the tasks table in the database.
 """
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
@@ -13,9 +13,13 @@ class Task(Base):
     Task model for storing task information.
     """
     __tablename__ = "tasks"
+    # task list queries filter by owner and optionally by completion status
+    __table_args__ = (Index("ix_tasks_user_completed", "user_id", "completed"),)
+
     id = Column(Integer, primary_key=True, index=True)
-    description = Column(String, index=True)
+    description = Column(String)
     completed = Column(Boolean, default=False)
     user_id = Column(Integer, ForeignKey("users.id"))
 
-    owner = relationship("User", back_populates="tasks")
\ No newline at end of file
+    # never lazy load - accessing owner without an explicit loader option raises instead of adding a query per task
+    owner = relationship("User", back_populates="tasks", lazy="raise")
\ No newline at end of file
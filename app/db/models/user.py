@@ -6,13 +6,10 @@ Defines the structure of the users table in the database.
 from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.hybrid import hybrid_property
-from passlib.context import CryptContext
 from app.db.base_class import Base
+from app.utils.hashing import get_pwd_context
 from app.utils.logging import logger
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 class User(Base):
     """
@@ -22,7 +19,7 @@ class User(Base):
         __tablename__ = the name of the DB table that will contain this object/s
         id (int): Primary key
         username (str): Unique username
-        hashed_password (str): Bcrypt hashed password
+        hashed_password (str): Argon2 (or legacy bcrypt) hashed password
         tasks (relationship): Relationship to associated Task objects
     """
     __tablename__ = 'users'
@@ -33,16 +30,26 @@ class User(Base):
 
     tasks = relationship("Task", back_populates="owner", cascade="all, delete-orphan")
 
-    def __init__(self, **kwargs):
-        if 'password' in kwargs:
-            password = kwargs.pop('password')
-            if not password:
-                raise ValueError("Password cannot be empty")
-        # If password is provided, hash it before storing
+    @classmethod
+    def create(cls, username: str, password: str) -> "User":
+        """
+        Build a new user, hashing the plain password once.
+
+        Args:
+            username (str): Unique username
+            password (str): Plain text password
+
+        Returns:
+            User: New (not yet persisted) user
+
+        Raises:
+            ValueError: If the password is empty or cannot be hashed
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
         try:
-            if 'password' in kwargs:
-                kwargs['hashed_password'] = pwd_context.hash(password)
+            hashed_password = get_pwd_context().hash(password)
         except Exception as e:
-            logger.error(f"Password hashing error: {str(e)}")
+            logger.error("Password hashing error: %s", e)
             raise ValueError(f"Error hashing password: {str(e)}")
-        super().__init__(**kwargs)
\ No newline at end of file
+        return cls(username=username, hashed_password=hashed_password)
\ No newline at end of file
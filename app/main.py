@@ -5,9 +5,9 @@ Creates and configures the FastAPI application.
 """
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from app.core.config import settings
-from app.db.base import init_database
+from app.db.base import init_database, close_database
 # import routers
 from app.api import auth, tasks
 from app.core.exceptions import APIException
@@ -19,21 +19,24 @@ app = FastAPI(
     title=settings.PROJECT_NAME,
     # openapi_url=f"{settings.API_V1_STR}/openapi.json"
     version="1.0.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
     # openapi_url="/openapi.json"
+    default_response_class=ORJSONResponse
 )
 
 
 #  exception handler for APIException
 @app.exception_handler(APIException)
-async def api_exception_handler(request: Request, exc: APIException) -> JSONResponse:
+async def api_exception_handler(request: Request, exc: APIException) -> ORJSONResponse:
     """
     Global exception handler for our custom APIException class.
     Converts APIException to a consistent JSON response format.
     """
     # Log the error
     logger.error(
-        f"API Error: {exc.message} - Path: {request.url.path}",
+        "API Error: %s - Path: %s",
+        exc.message,
+        request.url.path,
         extra={
             "status_code": exc.status_code,
             "detail": exc.detail,
@@ -50,7 +53,7 @@ async def api_exception_handler(request: Request, exc: APIException) -> JSONResp
     if exc.detail:
         error_response["additional_info"] = exc.detail
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content=error_response
     )
@@ -60,7 +63,14 @@ async def api_exception_handler(request: Request, exc: APIException) -> JSONResp
 @app.on_event("startup")
 async def startup_event():
     """Initialize application"""
-    init_database()
+    await init_database()
+
+
+# release pooled db connections on shutdown
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close application resources"""
+    await close_database()
 
 # Set all CORS enabled origins
 app.add_middleware(
@@ -69,6 +79,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[tasks.NEXT_PAGE_HEADER],  # pagination cursor must be readable by browser clients
 )
 
 # register the routers
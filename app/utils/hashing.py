@@ -0,0 +1,25 @@
+# app/utils/hashing.py
+"""
+Password hashing context shared by the security utilities and the User model.
+Kept in its own module so neither of them owns it and no import cycle can form.
+"""
+from functools import lru_cache
+from passlib.context import CryptContext
+from app.core.config import settings
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context() -> CryptContext:
+    """
+    Password hashing context - argon2id for new hashes, bcrypt kept so legacy hashes still verify.
+    Built once, on first use instead of at import.
+    """
+    return CryptContext(
+        schemes=["argon2", "bcrypt"],
+        default="argon2",
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS,
+        argon2__rounds=settings.ARGON2_ROUNDS,
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2__parallelism=1,
+    )
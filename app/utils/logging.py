@@ -1,16 +1,31 @@
 # app/utils/logging.py
 
+import atexit
 import logging
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from app.core.config import settings
+
+# File and terminal handlers - run on a background listener thread so the
+# request path only enqueues records instead of formatting and writing them
+formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(module)s:%(lineno)d] - %(message)s')
+file_handler = logging.FileHandler(f'app_{datetime.now().strftime("%Y%m%d")}.log')
+file_handler.setFormatter(formatter)
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(formatter)
+
+log_queue = queue.SimpleQueue()
+queue_handler = QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
+listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)
 
 # Configure logging to both file and terminal
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - [%(module)s:%(lineno)d] - %(message)s',
-    handlers=[
-        logging.FileHandler(f'app_{datetime.now().strftime("%Y%m%d")}.log'),
-        logging.StreamHandler()
-    ]
+    level=settings.LOG_LEVEL,
+    handlers=[queue_handler]
 )
 logger = logging.getLogger(__name__)
 
@@ -3,24 +3,34 @@
 Security utilities for JWT token handling, password hashing, and user authentication.
 Centralizes all security-related functionality.
 """
+import base64
+import hashlib
+import hmac
+import time
 import jwt
+import orjson
+from cachetools import TTLCache
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
-from jwt.exceptions import ExpiredSignatureError, InvalidTokenError, InvalidSignatureError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from jwt.exceptions import (
+    DecodeError,
+    ExpiredSignatureError,
+    ImmatureSignatureError,
+    InvalidAlgorithmError,
+    InvalidSignatureError,
+    InvalidTokenError,
+)
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from app.core.config import settings
+from app.core.config import settings, SECRET_KEY_BYTES
 from app.db.base import get_db
+from app.utils.hashing import get_pwd_context
 from app.utils.logging import logger
-from app.api.schemas.token import TokenData
 from app.db.models.user import User
 from app.core.exceptions import AuthenticationError
 
-# password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login",
@@ -31,6 +41,22 @@ oauth2_scheme = OAuth2PasswordBearer(
 # token type constants
 TOKEN_TYPE_ACCESS = "access"
 
+# HMAC digests for the supported JWT algorithms
+HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+# token -> (user id, username, expires at) cache, skips JWT verify + user lookup on repeat requests.
+# per-process only - with several workers each keeps its own copy
+USER_CACHE_TTL_SECONDS = 60
+_user_cache = TTLCache(maxsize=10000, ttl=USER_CACHE_TTL_SECONDS)
+
+# token settings resolved once at import - token creation/verification runs on the request path
+_ALGORITHM = settings.ALGORITHM
+_HMAC_DIGEST = HMAC_DIGESTS.get(_ALGORITHM)
+_DEFAULT_EXPIRE_DELTA = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
 
 
 
@@ -50,30 +76,89 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     if not data:
         raise ValueError("Token data cannot be empty")
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-        # add  token type and issued at time
+    now = datetime.now(timezone.utc)
+    expire = now + (expires_delta or _DEFAULT_EXPIRE_DELTA)
+    # add  token type and issued at time
     to_encode.update({
         "exp": expire,
         "type": TOKEN_TYPE_ACCESS,
-        "iat": datetime.now(timezone.utc)
+        "iat": now
     })
     try:
         encoded_jwt = jwt.encode(
             to_encode,
-            settings.SECRET_KEY,
-            algorithm=settings.ALGORITHM
+            SECRET_KEY_BYTES,
+            algorithm=_ALGORITHM
         )
         return encoded_jwt
     except Exception as e:
-        logger.error(f"Error creating token: {str(e)}")
+        logger.error("Error creating token: %s", e)
         raise ValueError(f"Error creating token: {str(e)}")
 
 
+def _b64url_decode(segment: str) -> bytes:
+    """Decode a base64url JWT segment, restoring the stripped padding."""
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _decode_jwt(token: str) -> dict:
+    """
+    Verify an HMAC signed JWT and return its payload.
+    Same checks as jwt.decode (algorithm, signature, exp, iat, nbf) but the signature
+    runs through hmac/OpenSSL directly and the JSON through orjson.
+
+    Args:
+        token (str): JWT token to decode
+
+    Returns:
+        dict: Decoded token payload
+
+    Raises:
+        InvalidTokenError: (or a subclass) if the token is malformed, badly signed or expired
+    """
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+    except ValueError:
+        raise DecodeError("Wrong number of segments")
+    try:
+        header = orjson.loads(_b64url_decode(header_b64))
+    except ValueError:
+        raise DecodeError("Invalid header padding")
+    if not isinstance(header, dict) or header.get("alg") != _ALGORITHM:
+        raise InvalidAlgorithmError("The specified alg value is not allowed")
+    if _HMAC_DIGEST is None:
+        raise InvalidAlgorithmError("Algorithm not supported")
+
+    # compare in canonical base64url form - decoding would ignore the unused low bits of the last character
+    expected = hmac.new(SECRET_KEY_BYTES, f"{header_b64}.{payload_b64}".encode(), _HMAC_DIGEST).digest()
+    if not hmac.compare_digest(base64.urlsafe_b64encode(expected).rstrip(b"="), signature_b64.encode()):
+        raise InvalidSignatureError("Signature verification failed")
+
+    try:
+        payload = orjson.loads(_b64url_decode(payload_b64))
+    except ValueError:
+        raise DecodeError("Invalid payload padding")
+    if not isinstance(payload, dict):
+        raise DecodeError("Invalid payload string: must be a json object")
+
+    # registered time claims
+    now = time.time()
+    claims = {}
+    for claim in ("exp", "iat", "nbf"):
+        if claim in payload:
+            try:
+                claims[claim] = int(payload[claim])
+            except (TypeError, ValueError):
+                raise DecodeError(f"The {claim} claim must be an integer")
+    if "exp" in claims and claims["exp"] <= now:
+        raise ExpiredSignatureError("Signature has expired")
+    if "iat" in claims and claims["iat"] > now:
+        raise ImmatureSignatureError("The token is not yet valid (iat)")
+    if "nbf" in claims and claims["nbf"] > now:
+        raise ImmatureSignatureError("The token is not yet valid (nbf)")
+    return payload
+
+
 def verify_token(token: str) -> dict:
     """
     Verify and decode a JWT token.
@@ -88,26 +173,17 @@ def verify_token(token: str) -> dict:
         HTTPException: With standardized error message for any token validation error
             """
     try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-            options={
-                "verify_signature": True,
-                "verify_exp": True,
-                "verify_iat": True,
-            }
-        )
+        payload = _decode_jwt(token)
         if payload.get("type") != TOKEN_TYPE_ACCESS:
             raise InvalidTokenError("Invalid token type")
 
         return payload
     except (ExpiredSignatureError, InvalidSignatureError, InvalidTokenError) as e:
         # log specific error but send to the user only the generic "Could not validate credentials"
-        logger.error(f"Token validation failed: {str(e)}")
+        logger.error("Token validation failed: %s", e)
         raise AuthenticationError(detail="Could not validate credentials")
     except Exception as e:
-        logger.error(f"Unexpected error during token validation: {str(e)}")
+        logger.error("Unexpected error during token validation: %s", e)
         raise AuthenticationError(detail=f"Could not validate credentials ")
 
 
@@ -127,9 +203,26 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     if not plain_password or not hashed_password:
         raise ValueError("Passwords cannot be empty")
     try:
-        return pwd_context.verify(plain_password, hashed_password)
+        return get_pwd_context().verify(plain_password, hashed_password)
     except Exception as e:
-        logger.error(f"Password verification error: {str(e)}")
+        logger.error("Password verification error: %s", e)
+        return False
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a stored hash uses a deprecated scheme or outdated parameters.
+
+    Args:
+        hashed_password (str): Stored password hash
+
+    Returns:
+        bool: True if the hash should be replaced on the next successful login
+    """
+    try:
+        return get_pwd_context().needs_update(hashed_password)
+    except Exception as e:
+        logger.error("Password hash inspection error: %s", e)
         return False
 
 
@@ -148,18 +241,18 @@ def get_password_hash(password: str) -> str:
     """
     if not password:
         raise ValueError("Password cannot be empty")
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 async def get_current_user(
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         token: str = Depends(oauth2_scheme)   # FastAPI will extract the Bearer token
 ) -> User:
     """
     Get current authenticated user.
 
     Args:
-        db (Session): Database session
+        db (AsyncSession): Database session
         token (str): JWT token from request
 
     Returns:
@@ -170,21 +263,35 @@ async def get_current_user(
     """
 
     try:
+        # return a detached user for tokens verified within the last minute
+        cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        cached = _user_cache.get(cache_key)
+        if cached is not None and cached[2] > time.time():
+            return User(id=cached[0], username=cached[1])
+
         # Verify the JWT token
         payload = verify_token(token)
         username: str = payload.get("sub")
         if username is None:
             logger.error("Token payload missing username")
             raise AuthenticationError(detail="ERROR : Username is missing")
-        # validate token data using the TokenData schema
-        token_data = TokenData(username=username)
+        # same guard as the TokenData schema, without building a model on every request
+        if not isinstance(username, str) or not username.strip():
+            logger.error("Token payload has an empty username")
+            raise AuthenticationError(detail="ERROR : Username cannot be empty")
 
         # gt user from db
-        user = db.query(User).filter(User.username == token_data.username).first()
+        user = (await db.execute(select(User).where(User.username == username))).scalar_one_or_none()
         if user is None:
-            logger.error(f"User not found: {username}")
+            logger.error("User not found: %s", username)
             raise AuthenticationError(detail=f"ERROR : User not found: {username}")
+
+        # cache no longer than the token itself stays valid
+        expires_at = time.time() + USER_CACHE_TTL_SECONDS
+        if "exp" in payload:
+            expires_at = min(expires_at, int(payload["exp"]))
+        _user_cache[cache_key] = (user.id, user.username, expires_at)
         return user
     except Exception as e:
-        logger.error(f"Unexpected error in authentication: {str(e)}")
+        logger.error("Unexpected error in authentication: %s", e)
         raise AuthenticationError(detail=f"Unexpected error in authentication, check logs for more details")
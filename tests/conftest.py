@@ -0,0 +1,228 @@
+# tests/conftest.py
+"""
+Shared test fixtures.
+The schema is created once per test session; every test runs inside an outer
+transaction (with a SAVEPOINT the app can commit/rollback) that is rolled back
+afterwards, so tests never see each other's data.
+Test users are seeded (committed) once per session and their tokens memoized, so
+most tests pay for neither a registration nor a login.
+Requests go through in-process httpx clients (anonymous, or per seeded user with their
+token as a default header) on a single session event loop.
+"""
+import os
+import asyncio
+import logging
+import pytest
+import pytest_asyncio
+
+# cheapest password hashing - settings are read when the app is first imported below
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("ARGON2_ROUNDS", "1")
+os.environ.setdefault("ARGON2_MEMORY_COST", "8")
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+# Import models and dependencies
+from app.db.base import Base, get_db
+from app.db.models.user import User
+from app.core.config import settings
+from app.main import app
+
+# Setup logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Create test database - in memory, on one shared connection (so every session sees it).
+# each process has its own, so pytest-xdist workers never share a database
+SQLALCHEMY_TEST_DATABASE_URL = "sqlite+aiosqlite://"
+engine = create_async_engine(
+    SQLALCHEMY_TEST_DATABASE_URL,
+    echo=True,
+    poolclass=StaticPool,
+    connect_args={"check_same_thread": False}
+)
+
+# the client sends relative paths under the API prefix, other routes need an absolute URL
+ROOT_URL = "http://test"
+
+# users that exist for the whole session - task state is still rolled back per test
+TEST_PASSWORD = "TestPass123"
+SEEDED_USERS = ("user1", "user2")
+# username -> access token, filled on the first login of each user
+_TOKEN_CACHE: dict = {}
+
+
+# the sqlite driver opens transactions lazily, which breaks SAVEPOINTs - emit BEGIN ourselves
+@event.listens_for(engine.sync_engine, "connect")
+def do_connect(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine.sync_engine, "begin")
+def do_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """One event loop for the whole session, so session fixtures and tests share it."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="session", autouse=True)
+async def setup_db():
+    """Create tables once for the whole test session and drop them at the end."""
+    logger.info("Setting up test database...")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+    logger.info("Test database cleanup complete")
+
+
+@pytest_asyncio.fixture(scope="session")
+async def seed_users(setup_db):
+    """Commit the shared test users once, outside of any per-test transaction."""
+    async with AsyncSession(engine) as session:
+        session.add_all([User.create(username, TEST_PASSWORD) for username in SEEDED_USERS])
+        await session.commit()
+    return SEEDED_USERS
+
+
+def _app_client(**kwargs) -> httpx.AsyncClient:
+    """HTTP client that calls the app in-process, with paths relative to the API prefix."""
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url=f"{ROOT_URL}{settings.API_V1_STR}",
+        **kwargs
+    )
+
+
+@pytest.fixture(scope="session")
+def root_url():
+    """Absolute URL of the app root, for routes outside the client's API prefix."""
+    return ROOT_URL
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client():
+    """In-process HTTP client calling the app directly, shared by all tests."""
+    async with _app_client() as c:
+        yield c
+
+
+@pytest_asyncio.fixture(scope="session")
+async def auth_clients():
+    """username -> client sending that user's token by default, opened on first use."""
+    clients = {}
+    yield clients
+    for c in clients.values():
+        await c.aclose()
+
+
+@pytest_asyncio.fixture(scope="session", autouse=True)
+async def warm_app():
+    """Build the OpenAPI schema (cached on the app) and the middleware stack before the first test."""
+    app.openapi()
+    # own client - test modules may override the client fixture (test_ver.py talks to a live server)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=ROOT_URL) as c:
+        await c.get("/")
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def db_session(request, setup_db):
+    """
+    Database session for one test, also served to the app through the get_db override.
+    Everything the test (or the app) commits only releases a SAVEPOINT; the outer
+    transaction is rolled back when the test ends.
+    Tests marked no_db get no connection - routes they call receive None instead of a session.
+    """
+    if request.node.get_closest_marker("no_db"):
+        async def no_db():
+            yield None
+
+        app.dependency_overrides[get_db] = no_db
+        yield None
+        app.dependency_overrides.pop(get_db, None)
+        return
+
+    connection = await engine.connect()
+    transaction = await connection.begin()
+    await connection.begin_nested()
+    session = AsyncSession(bind=connection, autoflush=False, expire_on_commit=False)
+
+    @event.listens_for(session.sync_session, "after_transaction_end")
+    def restart_savepoint(sync_session, sync_transaction):
+        # the app committed or rolled back - open a new SAVEPOINT for the next statement
+        if connection.closed:
+            return
+        if not connection.in_nested_transaction():
+            connection.sync_connection.begin_nested()
+
+    async def override_get_db():
+        try:
+            yield session
+        finally:
+            # each request gets a clean identity map, like a fresh session would
+            session.expunge_all()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield session
+    app.dependency_overrides.pop(get_db, None)
+    await session.close()
+    await transaction.rollback()
+    await connection.close()
+
+
+async def _get_or_create_token(client: httpx.AsyncClient, username: str) -> str:
+    """Log a seeded user in on first use and reuse the token afterwards."""
+    if username not in _TOKEN_CACHE:
+        response = await client.post(
+            "/login",
+            data={
+                "username": username,
+                "password": TEST_PASSWORD,
+                "grant_type": "password"
+            }
+        )
+        assert response.status_code == 200
+        _TOKEN_CACHE[username] = response.json()["access_token"]
+    return _TOKEN_CACHE[username]
+
+
+@pytest_asyncio.fixture
+async def user_token(client, seed_users, db_session):
+    """Access token of the first seeded user."""
+    return await _get_or_create_token(client, seed_users[0])
+
+
+@pytest_asyncio.fixture
+async def second_user_token(client, seed_users, db_session):
+    """Access token of the second seeded user, for cross-user access tests."""
+    return await _get_or_create_token(client, seed_users[1])
+
+
+def _get_auth_client(auth_clients: dict, username: str, token: str) -> httpx.AsyncClient:
+    """Return the shared client of a seeded user, creating it with their Authorization header."""
+    if username not in auth_clients:
+        auth_clients[username] = _app_client(headers={"Authorization": f"Bearer {token}"})
+    return auth_clients[username]
+
+
+@pytest_asyncio.fixture
+async def auth_client(auth_clients, seed_users, user_token):
+    """Client authenticated as the first seeded user."""
+    return _get_auth_client(auth_clients, seed_users[0], user_token)
+
+
+@pytest_asyncio.fixture
+async def second_auth_client(auth_clients, seed_users, second_user_token):
+    """Client authenticated as the second seeded user."""
+    return _get_auth_client(auth_clients, seed_users[1], second_user_token)
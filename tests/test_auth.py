@@ -2,108 +2,21 @@
 """
 Tests for authentication endpoints.
 """
-import os
-import pytest
 import logging
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-# Import models and dependencies
-from app.db.base import Base
-from app.main import app
-from app.core.config import settings
-from app.db.base import get_db
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
 from app.db.models.user import User
-from app.db.models.task import Task
+from app.utils.hashing import get_pwd_context
 
-# Setup logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Test database path and configuration
-TEST_DB_PATH = f"{settings.DATABASE_URL}"
-
-# Check test database path and permissions
-try:
-    test_db_dir = os.path.dirname(TEST_DB_PATH) or '.'
-    if not os.access(test_db_dir, os.W_OK):
-        logger.error(f"No write permission in test directory {test_db_dir}")
-        # else : logger.info(f"Test directory {test_db_dir} is writable")
-
-except Exception as e:
-    logger.error(f"Error checking test directory permissions: {e}")
-
-# Create test database
-SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(
-    SQLALCHEMY_TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    echo=True
-)
-
-
-
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Create test client
-client = TestClient(app)
-# helper function to get API URL
-def get_api_url(path: str) -> str:
-    """Get full API URL for given path"""
-    return f"{settings.API_V1_STR}{path}"
-
-# Override the get_db dependency
-def override_get_db():
-    """Get test database session."""
-    try:
-        db = TestingSessionLocal()
-        yield db
-    except Exception as e:
-        logger.error(f"Database error: {str(e)}")
-        raise
-    finally:
-        db.close()
-
-
-@pytest.fixture(autouse=True)
-def setup_db():
-    """Create tables before tests and drop them after."""
-    logger.info("Setting up test database...")
-    logger.info(f"Registered models before creation: {Base.metadata.tables.keys()}")
-    try:
-        # Drop all tables if they exist
-        Base.metadata.drop_all(bind=engine)
-        logger.info("Dropped all previous tables")
-        # test  connecting to the database
-        with engine.connect() as conn:
-            logger.info("Successfully connected to database")
-
-        # Create database tables in the right order ("create_all cause errors here)
-        User.__table__.create(engine, checkfirst=True)
-        logger.info("Created Users table")
-        Task.__table__.create(engine, checkfirst=True)
-        logger.info("Created Tasks table")
-        app.dependency_overrides[get_db] = override_get_db
-        # run the test
-        yield
-    except Exception as e:
-        logger.error(f"Database setup error: {str(e)}")
-        raise
-    finally:
-        # drop Tables
-        Base.metadata.drop_all(bind=engine)
-        if os.path.exists(TEST_DB_PATH):
-            os.remove(TEST_DB_PATH)
-            logger.info("Test database file removed")
-        app.dependency_overrides.clear()
-        logger.info("Test database cleanup complete")
-
-
-def test_register():
+
+async def test_register(client):
     """Test user registration"""
     logger.info("Starting test_register")
-    response = client.post(
-        get_api_url("/register"),
+    response = await client.post(
+        "/register",
         json={
             "username": "testuser",
             "password": "TestPass123"
@@ -117,11 +30,11 @@ def test_register():
     assert data["username"] == "testuser"
 
 
-def test_register_existing_user():
+async def test_register_existing_user(client):
     """Test registering an existing username"""
     # First registration
-    response = client.post(
-        get_api_url("/register"),
+    response = await client.post(
+        "/register",
         json={
             "username": "testuser",
             "password": "TestPass123"
@@ -130,22 +43,22 @@ def test_register_existing_user():
     assert response.status_code == 200
 
     # Try to register the same username
-    response = client.post(
-        get_api_url("/register"),
+    response = await client.post(
+        "/register",
         json={
             "username": "testuser",
             "password": "TestPass123"
         }
     )
-    assert response.status_code == 400
-    assert "Username already registered" in response.json()["detail"]
+    assert response.status_code == 409
+    assert "Username already registered" in response.json()["additional_info"]
 
 
-def test_login():
+async def test_login(client):
     """Test user login with OAuth2 form data"""
     # First register a user
-    client.post(
-        get_api_url("/register"),
+    await client.post(
+        "/register",
         json={
             "username": "testuser",
             "password": "TestPass123"
@@ -153,8 +66,8 @@ def test_login():
     )
 
     # Login with form data
-    response = client.post(
-        get_api_url("/login"),
+    response = await client.post(
+        "/login",
         data={  # Changed from json to form data
             "username": "testuser",
             "password": "TestPass123",
@@ -167,11 +80,11 @@ def test_login():
     assert data["token_type"] == "bearer"
 
 
-def test_login_wrong_password():
+async def test_login_wrong_password(client):
     """Test login with wrong password"""
     # First register a user
-    client.post(
-        get_api_url("/register"),
+    await client.post(
+        "/register",
         json={
             "username": "testuser",
             "password": "TestPass123"
@@ -179,8 +92,8 @@ def test_login_wrong_password():
     )
 
     # Try login with wrong password
-    response = client.post(
-        get_api_url("/login"),
+    response = await client.post(
+        "/login",
         data={
             "username": "testuser",
             "password": "wrongpass",
@@ -191,12 +104,13 @@ def test_login_wrong_password():
     assert "WWW-Authenticate" in response.headers
     assert response.headers["WWW-Authenticate"] == "Bearer"
 
-def test_invalid_token():
+@pytest.mark.no_db
+async def test_invalid_token(client):
     """Test accessing protected endpoint with invalid token"""
     logger.info(f"inside test_invalid_token...")
 
     headers = {"Authorization": "Bearer invalid_token"}
-    response = client.get(get_api_url("/tasks"), headers=headers)
+    response = await client.get("/tasks", headers=headers)
     logger.info(f"Full response: {response.json()}")
 
     details_json = response.json()["detail"]
@@ -206,3 +120,50 @@ def test_invalid_token():
     assert response.headers["WWW-Authenticate"] == "Bearer"
     assert "Could not validate credentials" in response.json()["detail"]
 
+
+async def add_legacy_user(db_session, username: str, password: str = "TestPass123"):
+    """Store a user whose password hash uses the legacy bcrypt scheme"""
+    db_session.add(User(username=username, hashed_password=get_pwd_context().handler("bcrypt").hash(password)))
+    await db_session.commit()
+
+
+async def test_login_upgrades_legacy_hash(client, db_session):
+    """Test that logging in with a bcrypt hash stores an argon2 hash instead"""
+    await add_legacy_user(db_session, "legacyuser")
+
+    response = await client.post(
+        "/login",
+        data={
+            "username": "legacyuser",
+            "password": "TestPass123",
+            "grant_type": "password"
+        }
+    )
+    assert response.status_code == 200
+
+    stored_hash = await db_session.scalar(select(User.hashed_password).where(User.username == "legacyuser"))
+    assert stored_hash.startswith("$argon2id$")
+
+
+async def test_login_rehash_failure_still_logs_in(client, db_session, monkeypatch):
+    """Test that a failed hash upgrade keeps the old hash but still returns a token"""
+    await add_legacy_user(db_session, "lockeduser")
+
+    async def locked_commit():
+        raise OperationalError("UPDATE users", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(db_session, "commit", locked_commit)
+    response = await client.post(
+        "/login",
+        data={
+            "username": "lockeduser",
+            "password": "TestPass123",
+            "grant_type": "password"
+        }
+    )
+    monkeypatch.undo()
+    assert response.status_code == 200
+    assert "access_token" in response.json()
+
+    stored_hash = await db_session.scalar(select(User.hashed_password).where(User.username == "lockeduser"))
+    assert stored_hash.startswith("$2b$")
@@ -0,0 +1,20 @@
+# tests/test_db.py
+"""
+Tests for database initialization helpers.
+"""
+from sqlalchemy import text
+from app.db.base import drop_obsolete_indexes
+
+
+async def test_drop_obsolete_indexes(db_session):
+    """Test that the old description index is dropped from an existing tasks table"""
+    connection = await db_session.connection()
+    await connection.exec_driver_sql("CREATE INDEX ix_tasks_description ON tasks (description)")
+
+    await connection.run_sync(drop_obsolete_indexes)
+    await connection.run_sync(drop_obsolete_indexes)  # no-op once the index is gone
+
+    remaining = await connection.scalar(
+        text("SELECT count(*) FROM sqlite_master WHERE type = 'index' AND name = 'ix_tasks_description'")
+    )
+    assert remaining == 0
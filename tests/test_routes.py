@@ -1,16 +1,15 @@
 # tests/test_routes.py
-from fastapi.testclient import TestClient
+import pytest
 from app.main import app
 from app.core.exceptions import NotFoundError
 from app.core.config import settings
 
-client = TestClient(app)
 
-
-def test_api_prefix():
-    response = client.get("/docs")  # OpenAPI docs should be available
+@pytest.mark.no_db
+async def test_api_prefix(client, root_url):
+    response = await client.get(f"{root_url}/docs")  # OpenAPI docs should be available
     assert response.status_code == 200
-    response = client.get("/")  # Root endpoint should still work
+    response = await client.get(f"{root_url}/")  # Root endpoint should still work
     assert response.status_code == 200
     assert response.json() == {
         "message": "Welcome to Task Management System API",
@@ -20,15 +19,24 @@ def test_api_prefix():
 
 
 
+async def _test_error():
+    raise NotFoundError("Test resource not found", detail="Additional error info")
+
+
+@pytest.fixture(scope="session")
+def error_route():
+    """Register the /test-error endpoint once and remove it after the session."""
+    app.add_api_route("/test-error", _test_error, include_in_schema=False)
+    yield "/test-error"
+    app.router.routes = [route for route in app.router.routes if getattr(route, "path", None) != "/test-error"]
+
+
 #   test for error handler
-def test_error_handler():
+@pytest.mark.no_db
+async def test_error_handler(client, root_url, error_route):
     """Test custom error handler with a test endpoint"""
-    @app.get("/test-error")
-    async def test_error():
-        raise NotFoundError("Test resource not found", detail="Additional error info")
-
-    response = client.get("/test-error")
+    response = await client.get(f"{root_url}{error_route}")
     assert response.status_code == 404
     data = response.json()
     assert data["detail"] == "Test resource not found"
-    assert data["additional_info"] == "Additional error info"
\ No newline at end of file
+    assert data["additional_info"] == "Additional error info"
@@ -4,12 +4,33 @@ Tests for security utilities.
 """
 import sys
 import os
+import string
 import pytest
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import jwt
 from jwt.exceptions import InvalidTokenError
-from app.utils.security import create_access_token, verify_token, get_password_hash, verify_password
+from app.utils.security import create_access_token, verify_token, get_password_hash, verify_password, password_needs_rehash, get_current_user
+from app.utils.hashing import get_pwd_context
+from app.db.models.user import User
+from app.core.exceptions import AuthenticationError
 from datetime import timedelta
 
+pytestmark = pytest.mark.no_db
+
+
+class StubSession:
+    """Minimal async session stand-in that returns a fixed user and counts queries."""
+    def __init__(self, user):
+        self.user = user
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        return self
+
+    def scalar_one_or_none(self):
+        return self.user
+
 
 
 
@@ -68,4 +89,45 @@ def test_incorrect_token():
 def test_empty_token_data():
     """Test creating token with empty data"""
     with pytest.raises(ValueError):
-        create_access_token({})  # Empty data should raise error
\ No newline at end of file
+        create_access_token({})  # Empty data should raise error
+
+def test_legacy_bcrypt_hash():
+    """Test that legacy bcrypt hashes still verify and are flagged for rehash"""
+    password = "testpassword"
+    legacy_hash = get_pwd_context().handler("bcrypt").hash(password)
+    assert verify_password(password, legacy_hash)
+    assert password_needs_rehash(legacy_hash)
+    assert not password_needs_rehash(get_password_hash(password))
+
+
+def test_token_algorithm_none_rejected():
+    """Test that an unsigned token (alg=none) is rejected"""
+    token = jwt.encode({"sub": "testuser", "type": "access"}, key=None, algorithm="none")
+    with pytest.raises(AuthenticationError):
+        verify_token(token)
+
+
+def test_token_signature_last_char_tampered():
+    """Test that changing only the last signature character is rejected, for every replacement"""
+    token = create_access_token({"sub": "testuser"})
+    head, last = token[:-1], token[-1]
+    alphabet = string.ascii_letters + string.digits + "-_"
+    for char in alphabet.replace(last, ""):
+        with pytest.raises(AuthenticationError):
+            verify_token(head + char)
+
+
+async def test_current_user_cached():
+    """Test that a repeated token resolves the user without another DB query"""
+    token = create_access_token({"sub": "cacheduser"})
+    db = StubSession(User(id=7, username="cacheduser"))
+    first = await get_current_user(db=db, token=token)
+    second = await get_current_user(db=db, token=token)
+    assert db.queries == 1
+    assert (second.id, second.username) == (first.id, first.username) == (7, "cacheduser")
+
+def test_user_create_hashes_password():
+    """Test that User.create stores only the password hash"""
+    user = User.create(username="newuser", password="Secret123")
+    assert user.hashed_password != "Secret123"
+    assert verify_password("Secret123", user.hashed_password)
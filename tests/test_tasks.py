@@ -3,74 +3,38 @@
 Tests for task management endpoints.
 """
 import pytest
-from fastapi.testclient import TestClient
+import pytest_asyncio
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.main import app
-from app.core.config import settings
-from .test_auth import setup_db, override_get_db  # Reuse auth test fixtures
-
-client = TestClient(app)
-
-
-def get_api_url(path: str) -> str:
-    """Get full API URL for given path"""
-    return f"{settings.API_V1_STR}{path}"
-
-
-#  helper function to create a test user and get token
-def create_test_user(username: str, password: str = "TestPass123"):
-    """Helper function to create a test user and return token"""
-    # Register user
-    register_response = client.post(
-        get_api_url("/register"),
-        json={
-            "username": username,
-            "password": password
-        }
-    )
-    assert register_response.status_code == 200
-
-    # Login to get token
-    login_response = client.post(
-        get_api_url("/login"),
-        data={
-            "username": username,
-            "password": password,
-            "grant_type": "password"
-        }
-    )
-    assert login_response.status_code == 200
-    return login_response.json()["access_token"]
+from app.db.models.task import Task
 
 
 #  helper function to create a task
-def create_test_task(token: str, description: str = "Test task"):
-    """Helper function to create a test task and return its data"""
-    headers = {"Authorization": f"Bearer {token}"}
-    response = client.post(
-        get_api_url("/tasks"),
-        json={"description": description},
-        headers=headers
+async def create_test_task(client, description: str = "Test task"):
+    """Helper function to create a test task (owned by the client's user) and return its data"""
+    response = await client.post(
+        "/tasks",
+        json={"description": description}
     )
     assert response.status_code == 200
     return response.json()
 
 
+#  fixture for tests that need a user with an existing task
+@pytest_asyncio.fixture
+async def user_with_task(auth_client):
+    """One task owned by the first test user (the auth_client user)"""
+    return await create_test_task(auth_client, "Original description")
 
-def test_create_task(setup_db):
-    """Test creating a new task"""
-    #  register and login a user
-
-    token = create_test_user("create_task_user")
 
+async def test_create_task(auth_client):
+    """Test creating a new task"""
     # Create a task
-    headers = {"Authorization": f"Bearer {token}"}
     task_data = {"description": "Test task"}
-    response = client.post(
-        get_api_url("/tasks"),
-        json=task_data,
-        headers=headers
+    response = await auth_client.post(
+        "/tasks",
+        json=task_data
     )
 
     # Verify response
@@ -82,200 +46,147 @@ def test_create_task(setup_db):
     assert "user_id" in data
 
 
-def test_create_task_unauthorized():
+@pytest.mark.no_db
+async def test_create_task_unauthorized(client):
     """Test creating a task without authentication"""
     task_data = {"description": "Test task"}
-    response = client.post(
-        get_api_url("/tasks"),
+    response = await client.post(
+        "/tasks",
         json=task_data
     )
     assert response.status_code == 401
     assert "detail" in response.json()
 
 
-def test_create_task_empty_description():
+async def test_create_task_empty_description(auth_client):
     """Test creating a task with empty description"""
-    #  register and login a test user
-    token =create_test_user("create_task_empty_description_user")
-
     # Try to create a task with empty description
-    headers = {"Authorization": f"Bearer {token}"}
     task_data = {"description": ""}
-    response = client.post(
-        get_api_url("/tasks"),
-        json=task_data,
-        headers=headers
+    response = await auth_client.post(
+        "/tasks",
+        json=task_data
     )
 
     # Verify response
     assert response.status_code == 422  # Validation error
 
 
-#  test for updating task description
-def test_update_task_description(setup_db):
-    """Test updating only the task description"""
-    token = create_test_user("update_desc_user")
-    task = create_test_task(token, "Original description")
-
-    # Update task description
-    headers = {"Authorization": f"Bearer {token}"}
-    response = client.put(
-        get_api_url(f"/tasks/{task['id']}"),
-        json={"description": "Updated description"},
-        headers=headers
+#  test for listing tasks with the completion filter
+async def test_get_tasks_filter_completed(auth_client):
+    """Test listing tasks, with and without the completed filter"""
+    open_task = await create_test_task(auth_client, "Open task")
+    done_task = await create_test_task(auth_client, "Done task")
+    await auth_client.put(
+        f"/tasks/{done_task['id']}",
+        json={"completed": True}
     )
 
+    response = await auth_client.get("/tasks")
     assert response.status_code == 200
-    data = response.json()
-    assert data["description"] == "Updated description"
-    assert data["completed"] == False  # Should remain unchanged
-    assert data["id"] == task["id"]
-
-
-# test for updating task completion status
-def test_update_task_completion(setup_db):
-    """Test updating only the task completion status"""
-    token = create_test_user("update_status_user")
-    task = create_test_task(token)
-
-    # Update task completion status
-    headers = {"Authorization": f"Bearer {token}"}
-    response = client.put(
-        get_api_url(f"/tasks/{task['id']}"),
-        json={"completed": True},
-        headers=headers
-    )
+    assert [task["id"] for task in response.json()] == [open_task["id"], done_task["id"]]
 
+    response = await auth_client.get("/tasks?completed=true")
     assert response.status_code == 200
-    data = response.json()
-    assert data["completed"] == True
-    assert data["description"] == task["description"]  # Should remain unchanged
-
-
-#  test for updating both fields
-def test_update_task_both_fields(setup_db):
-    """Test updating both description and completion status"""
-    token = create_test_user("update_both_user")
-    task = create_test_task(token)
-
-    # Update both fields
-    headers = {"Authorization": f"Bearer {token}"}
-    response = client.put(
-        get_api_url(f"/tasks/{task['id']}"),
-        json={
-            "description": "New description",
-            "completed": True
-        },
-        headers=headers
+    assert response.json() == [{**done_task, "completed": True}]
+
+
+#  test for paging through tasks
+async def test_get_tasks_pagination(auth_client):
+    """Test keyset pagination of the task list"""
+    task_ids = [(await create_test_task(auth_client, f"Task {i}"))["id"] for i in range(3)]
+
+    response = await auth_client.get("/tasks?limit=2")
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()] == task_ids[:2]
+    next_after = response.headers["X-Next-After"]
+
+    response = await auth_client.get(f"/tasks?limit=2&after_id={next_after}")
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()] == task_ids[2:]
+    assert "X-Next-After" not in response.headers
+
+
+#  test for updating the description, the completion status or both
+@pytest.mark.parametrize("payload", [
+    {"description": "Updated description"},
+    {"completed": True},
+    {"description": "New description", "completed": True},
+], ids=["description", "completion", "both_fields"])
+async def test_update_task(auth_client, user_with_task, payload):
+    """Test that updating a task changes only the given fields"""
+    task = user_with_task
+
+    response = await auth_client.put(
+        f"/tasks/{task['id']}",
+        json=payload
     )
 
     assert response.status_code == 200
-    data = response.json()
-    assert data["description"] == "New description"
-    assert data["completed"] == True
+    assert response.json() == {**task, **payload}  # other fields remain unchanged
 
 
 #  test for non-existent task
-def test_update_nonexistent_task(setup_db):
+async def test_update_nonexistent_task(auth_client):
     """Test updating a task that doesn't exist"""
-    token = create_test_user("nonexistent_user")
 
     # Try to update non-existent task
-    headers = {"Authorization": f"Bearer {token}"}
-    response = client.put(
-        get_api_url("/tasks/99999"),  # Non-existent task ID
-        json={"description": "New description"},
-        headers=headers
+    response = await auth_client.put(
+        "/tasks/99999",  # Non-existent task ID
+        json={"description": "New description"}
     )
 
     assert response.status_code == 404
     assert response.json()["detail"] == "Task does not exist"
 
 
-#  test for unauthorized task access
-def test_update_unauthorized_task(setup_db):
-    """Test updating a task owned by another user"""
-    # Create first user and their task
-    token1 = create_test_user("user1")
-    task = create_test_task(token1)
-
-    # Create second user and try to update first user's task
-    token2 = create_test_user("user2")
-    headers = {"Authorization": f"Bearer {token2}"}
-    response = client.put(
-        get_api_url(f"/tasks/{task['id']}"),
-        json={"description": "Unauthorized update"},
-        headers=headers
-    )
-
-    assert response.status_code == 403
-    assert response.json()["detail"] == "You don't have permission to access this task"
-
-
-def test_delete_task(setup_db):
+async def test_delete_task(auth_client, user_with_task, db_session):
     """Test successfully deleting a task"""
-    # Create user and task
-    token = create_test_user("delete_user")
-    task = create_test_task(token)
+    task = user_with_task
 
     # Delete the task
-    headers = {"Authorization": f"Bearer {token}"}
-    response = client.delete(
-        get_api_url(f"/tasks/{task['id']}"),
-        headers=headers
-    )
+    response = await auth_client.delete(f"/tasks/{task['id']}")
 
     # Verify deletion response matches spec exactly
     assert response.status_code == 200
     assert response.json() == {"message": "Task deleted successfully"}
 
     # Verify task is actually deleted
-    get_response = client.get(
-        get_api_url("/tasks"),
-        headers=headers
+    remaining = await db_session.scalar(
+        select(func.count()).select_from(Task).where(Task.user_id == task["user_id"])
     )
-    tasks = get_response.json()
-    assert len(tasks) == 0
+    assert remaining == 0
 
 
-def test_delete_nonexistent_task(setup_db):
+async def test_delete_nonexistent_task(auth_client):
     """Test deleting a task that doesn't exist"""
-    token = create_test_user("nonexistent_delete_user")
 
-    headers = {"Authorization": f"Bearer {token}"}
-    response = client.delete(
-        get_api_url("/tasks/99999"),
-        headers=headers
-    )
+    response = await auth_client.delete("/tasks/99999")
 
     assert response.status_code == 404
     assert response.json()["detail"] == "Task does not exist"
 
 
-def test_delete_unauthorized_task(setup_db):
-    """Test deleting a task owned by another user"""
-    # Create first user and their task
-    token1 = create_test_user("user1_delete")
-    task = create_test_task(token1)
+#  test for unauthorized task access, for every verb that targets a single task
+@pytest.mark.parametrize("method, payload", [
+    ("PUT", {"description": "Unauthorized update"}),
+    ("DELETE", None),
+], ids=["update", "delete"])
+async def test_cross_user_forbidden(second_auth_client, user_with_task, db_session, method, payload):
+    """Test updating or deleting a task owned by another user"""
+    task = user_with_task
 
-    # Create second user and try to delete first user's task
-    token2 = create_test_user("user2_delete")
-    headers = {"Authorization": f"Bearer {token2}"}
-    response = client.delete(
-        get_api_url(f"/tasks/{task['id']}"),
-        headers=headers
+    # Second user tries to modify first user's task
+    response = await second_auth_client.request(
+        method,
+        f"/tasks/{task['id']}",
+        json=payload
     )
 
     assert response.status_code == 403
     assert response.json()["detail"] == "You don't have permission to access this task"
 
-    # Verify task still exists for original user
-    headers1 = {"Authorization": f"Bearer {token1}"}
-    get_response = client.get(
-        get_api_url("/tasks"),
-        headers=headers1
-    )
-    tasks = get_response.json()
-    assert len(tasks) == 1
-    assert tasks[0]["id"] == task["id"]
-
+    # Verify task is unchanged for original user
+    stored = (await db_session.execute(
+        select(Task.id, Task.description).where(Task.user_id == task["user_id"])
+    )).all()
+    assert [tuple(row) for row in stored] == [(task["id"], task["description"])]
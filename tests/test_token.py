@@ -6,6 +6,8 @@ import pytest
 from pydantic import ValidationError
 from app.api.schemas.token import Token, TokenData
 
+pytestmark = pytest.mark.no_db
+
 
 def test_token_schema():
     """Test Token schema validation"""